@@ -4,18 +4,58 @@
 - 複数日チェック: 環境変数 TARGET_DATE_LABELS（例 "11/1,11/2"）
 - 行指定        : 環境変数 TARGET_ROWS（例 "キャンプ宿泊,キャンプ日帰り"）
 - LINE送信      : 環境変数 LINE_CHANNEL_ACCESS_TOKEN（Messaging APIのチャネルアクセストークン）
-- 挙動          : 「〇 / ○ / △（△ 残1 など含む）」が1つでもあれば通知。空き無しは通知しない。
+- 監視URL       : 環境変数 PAGE_URLS（例 "URL1,URL2"。複数指定なら1ブラウザで並行チェック）
+- 取得方法      : 環境変数 FETCH_MODE（auto=HTTP直取得→だめならブラウザ / http / browser）
+- 常駐モード    : --daemon フラグ。環境変数 INTERVAL_SEC（チェック間隔秒、既定600）
+- キャッシュ    : 環境変数 CACHE_TTL_SEC（ページ未更新時の取得スキップ。0で無効）、
+                  CACHE_FILE（既定 ~/.cache/fumoto.json）、
+                  TABLE_CACHE_TTL_SEC（解析済みテーブルのプロセス内使い回し上限秒）
+- 挙動          : 「〇 / ○ / ◎ / △（△ 残1 など含む。NFKC正規化で表記ゆれも吸収）」が
+                  1つでもあれば通知。空き無しは通知しない。
 """
 
 import os
 import sys
 import re
-import requests
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+import json
+import time
+import hashlib
+import itertools
+import unicodedata
+from datetime import date
+from functools import lru_cache
+
+# playwright / requests は import だけで150〜300ms かかるため、実際に使う関数内で
+# 遅延importする（トークン未設定の no-op やキャッシュスキップ時の起動を速くする）
+
+try:
+    # 監視対象（行×日付）が増えたとき空き判定をC側で回すために使う。無くても動く
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    # 常駐モードの通知でTLSハンドシェイク（~100-300ms/回）を省くためHTTP/2＋接続使い回し。
+    # 無ければ requests.Session にフォールバック
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    # TARGET_ROWS が増えたとき行ラベル照合を1走査で済ませる（pyahocorasick）。無くても動く
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # ========= 設定（環境変数） =========
 PAGE_URL = "https://reserve.fumotoppara.net/reserved/reserved-calendar-list"
 
+# 複数ページ監視: "URL1,URL2" 形式。未設定なら PAGE_URL のみ
+PAGE_URLS = [s.strip() for s in os.getenv("PAGE_URLS", "").split(",") if s.strip()] or [PAGE_URL]
+# 1件だけ指定された場合も単一URLパス（HTTP直取得・キャッシュ込み）でそのURLを見るよう、
+# 実効URLを差し替える
+PAGE_URL = PAGE_URLS[0]
+
 # 複数日: "11/1,11/2" など。未設定なら単一日の TARGET_DATE_LABEL を見る
 _labels_env = os.getenv("TARGET_DATE_LABELS", "").strip()
 if _labels_env:
@@ -26,8 +66,38 @@ else:
 TARGET_ROWS = [s.strip() for s in os.getenv("TARGET_ROWS", "キャンプ宿泊,キャンプ日帰り").split(",") if s.strip()]
 LINE_CHANNEL_ACCESS_TOKEN = os.getenv("LINE_CHANNEL_ACCESS_TOKEN", "").strip()
 TIMEOUT_MS = int(os.getenv("TIMEOUT_MS", "60000"))
+# --daemon 時のチェック間隔（秒）
+INTERVAL_SEC = int(os.getenv("INTERVAL_SEC", "600"))
+# 解析済みテーブルの使い回し上限（秒）。HTMLが変わっていなければ再パースを省く
+TABLE_CACHE_TTL_SEC = int(os.getenv("TABLE_CACHE_TTL_SEC", "3600"))
+# 取得方法: auto（HTTP→だめならブラウザ）/ http / browser
+FETCH_MODE = os.getenv("FETCH_MODE", "auto").strip().lower()
+# ディスクキャッシュ: ページ未更新なら取得自体をスキップする。0 で無効（既定）
+CACHE_TTL_SEC = int(os.getenv("CACHE_TTL_SEC", "0"))
+CACHE_FILE = os.path.expanduser(os.getenv("CACHE_FILE", "~/.cache/fumoto.json"))
+
+# 「空きあり」とみなす記号。NFKC正規化済みの frozenset を一度だけ作っておき、
+# セル側も NFKC で揃えることで全角/互換文字の表記ゆれによる取りこぼしを防ぐ。
+# 「△ 残1」のように他の文字が付くセルは部分一致で拾う
+OK_SYMBOLS = frozenset(unicodedata.normalize("NFKC", c) for c in ("〇", "○", "◎", "△"))
 
 # ========= 通知 =========
+_http_client = None
+
+def _get_http_client():
+    """通知用HTTPクライアント。接続を使い回して毎回のTCP/TLS確立を省く。"""
+    global _http_client
+    if _http_client is None:
+        if httpx is not None:
+            try:
+                _http_client = httpx.Client(http2=True, timeout=30)
+            except ImportError:  # h2 未導入なら HTTP/1.1 のまま使い回す
+                _http_client = httpx.Client(timeout=30)
+        else:
+            import requests
+            _http_client = requests.Session()
+    return _http_client
+
 def line_broadcast(message: str):
     """LINE Messaging API の Broadcast で通知（友だち=自分だけなら実質自分宛）。"""
     if not LINE_CHANNEL_ACCESS_TOKEN:
@@ -35,7 +105,7 @@ def line_broadcast(message: str):
         return
     headers = {"Authorization": f"Bearer {LINE_CHANNEL_ACCESS_TOKEN}", "Content-Type": "application/json"}
     data = {"messages": [{"type": "text", "text": message}]}
-    res = requests.post("https://api.line.me/v2/bot/message/broadcast", headers=headers, json=data, timeout=30)
+    res = _get_http_client().post("https://api.line.me/v2/bot/message/broadcast", headers=headers, json=data, timeout=30)
     try:
         res.raise_for_status()
     except Exception:
@@ -44,8 +114,11 @@ def line_broadcast(message: str):
 
 # ========= 解析ユーティリティ =========
 def normalize_text(s: str) -> str:
-    return re.sub(r"\s+", " ", s).strip()
+    # NFKCで全角英数などの表記ゆれを畳んでから空白を正規化する。
+    # str.split/join はC実装で re.sub(r"\s+", " ", s) より大幅に速い（全角空白も畳む）
+    return " ".join(unicodedata.normalize("NFKC", s).split())
 
+@lru_cache(maxsize=64)
 def _date_candidates(label: str):
     """
     "11/1" と "11/01"、"11/1(日)" のような表記ゆれに部分一致で耐える。
@@ -58,7 +131,35 @@ def _date_candidates(label: str):
         return {f"{mon}/{day_nz}", f"{mon}/{day_z2}"}
     return {label}
 
-def pick_column_index(headers, date_label):
+_HEADER_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})")
+
+def build_header_index(headers):
+    """ヘッダー1走査で {日付表記: 列index} の逆引き辞書を作る。
+
+    日付D個それぞれで全ヘッダーを走査する O(D・H) を O(H+D) に落とす。
+    ゼロ詰めの表記ゆれ（"11/1" / "11/01"）は両方のキーを登録して吸収する。
+    """
+    index = {}
+    for i, h in enumerate(headers):
+        m = _HEADER_DATE_RE.search(normalize_text(h))
+        if not m:
+            continue
+        mon, day = m.group(1), m.group(2)
+        mons = {mon, mon.lstrip("0") or "0", mon.zfill(2)}
+        days = {day.lstrip("0") or "0", day.zfill(2)}
+        for mo in mons:
+            for dy in days:
+                index.setdefault(f"{mo}/{dy}", i)
+    return index
+
+def pick_column_index(headers, date_label, header_index=None):
+    if header_index is None:
+        header_index = build_header_index(headers)
+    for c in _date_candidates(date_label):
+        idx = header_index.get(c)
+        if idx is not None:
+            return idx
+    # 日付形式でないラベル等は従来どおり部分一致で線形走査
     cands = _date_candidates(date_label)
     for i, h in enumerate(headers):
         hx = normalize_text(h)
@@ -67,94 +168,262 @@ def pick_column_index(headers, date_label):
                 return i
     return None
 
-def fetch_cell_symbol(page, row_label, date_label):
-    # テーブル描画待ち（いくつかの候補セレクタで待つ）
-    for sel in ("table", "div[role='table']", "div:has-text('予約カレンダー')"):
-        try:
-            page.wait_for_selector(sel, timeout=TIMEOUT_MS)
-            break
-        except PlaywrightTimeoutError:
-            continue
+# テーブル全体をページ内JSで一度だけ読む（セルごとの query_selector 往復をなくす）
+_EXTRACT_TABLE_JS = """
+() => {
+  const table = document.querySelector('table');
+  const headers = [...document.querySelectorAll('thead th')].map(el => el.innerText);
+  const rows = [...document.querySelectorAll('tbody tr')].map(tr => {
+    const cells = [...tr.cells];
+    return {
+      label: cells.length ? cells[0].innerText : "",
+      cells: cells.map(c => c.innerText),
+    };
+  });
+  return {headers, rows, html: table ? table.outerHTML : ""};
+}
+"""
+
+# 解析済みテーブルのプロセス内キャッシュ {(URL, 日付): {"hash", "ts", "table"}}
+# 常駐モードでHTMLが前回と同一なら正規化をやり直さない。日付が変われば自然に無効化される
+_TABLE_CACHE: dict = {}
+
+def _normalize_raw_table(raw):
+    headers = [normalize_text(h) for h in raw["headers"]]
+    rows = [
+        {"label": normalize_text(r["label"]), "cells": [normalize_text(c) for c in r["cells"]]}
+        for r in raw["rows"]
+    ]
+    return {"headers": headers, "rows": rows}
+
+def extract_table(page):
+    """page.evaluate 1回でテーブル全体を {headers, rows} として取得する。"""
+    raw = page.evaluate(_EXTRACT_TABLE_JS)
+    digest = hashlib.sha1(raw["html"].encode("utf-8")).hexdigest()
+    key = (PAGE_URL, date.today().isoformat())
+    cached = _TABLE_CACHE.get(key)
+    if cached and cached["hash"] == digest and time.time() - cached["ts"] < TABLE_CACHE_TTL_SEC:
+        return cached["table"]
+
+    table = _normalize_raw_table(raw)
+    _TABLE_CACHE.clear()  # 保持するのは最新スナップショット1件だけで十分
+    _TABLE_CACHE[key] = {"hash": digest, "ts": time.time(), "table": table}
+    return table
+
+_ROW_AUTOMATON = None
 
-    # ヘッダー取得
-    header_cells = page.query_selector_all("thead th") or page.query_selector_all("table tr:nth-child(1) th, table tr:nth-child(1) td")
-    headers = [normalize_text(h.inner_text()) for h in header_cells]
-    col_idx = pick_column_index(headers, date_label)
+def _row_automaton():
+    """TARGET_ROWS をまとめた Aho-Corasick オートマトン（遅延構築・使い回し）。"""
+    global _ROW_AUTOMATON
+    if _ROW_AUTOMATON is None:
+        A = ahocorasick.Automaton()
+        for r in TARGET_ROWS:
+            A.add_word(r, r)
+        A.make_automaton()
+        _ROW_AUTOMATON = A
+    return _ROW_AUTOMATON
+
+def match_target_rows(table):
+    """{ターゲット行名: 行dict} を作る（各ターゲットにつき最初に一致した行）。
+
+    pyahocorasick があれば各行ラベルを1回走査するだけで全ターゲットを照合でき、
+    O(R・rows・|label|) が O((rows + R)・|label|) になる。無ければ従来の部分一致。
+    """
+    matched = {}
+    if ahocorasick is not None and TARGET_ROWS:
+        A = _row_automaton()
+        for r in table["rows"]:
+            for _, target in A.iter(r["label"]):
+                matched.setdefault(target, r)
+    else:
+        for r in table["rows"]:
+            for target in TARGET_ROWS:
+                if target not in matched and target in r["label"]:
+                    matched[target] = r
+    return matched
+
+def fetch_cell_symbol(table, row_label, date_label, col_idx, target_row):
     if col_idx is None:
         raise RuntimeError(f"ヘッダーから日付 '{date_label}' の列が見つかりませんでした。")
-
-    # 行取得（先頭セルに行名が含まれる行を探す）
-    rows = page.query_selector_all("tbody tr") or page.query_selector_all("table tr")
-    target_row = None
-    for r in rows:
-        first_cell = r.query_selector("th") or r.query_selector("td")
-        if not first_cell:
-            continue
-        label = normalize_text(first_cell.inner_text())
-        if row_label in label:
-            target_row = r
-            break
     if not target_row:
         raise RuntimeError(f"行 '{row_label}' が見つかりませんでした。")
+    headers = table["headers"]
+
+    # 対象セル（列）取得。行頭セルがラベルの場合のオフセットに備える
+    cells = target_row["cells"]
+    j = col_idx - 1 if len(cells) + 1 == len(headers) else col_idx
+    if 0 <= j < len(cells):
+        return cells[j]
+
+    raise RuntimeError(f"列インデックス計算に失敗しました (j={j}, len={len(cells)}).")
+
+# ========= ブラウザ設定 =========
+# テーブルを読むだけなので画像・フォント等は不要。遮断して転送量と読み込み時間を削る。
+# document/xhr/fetch/script は残す（テーブルがJS描画される可能性があるため）
+_BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+_BLOCKED_HOSTS_RE = re.compile(r"google-analytics|googletagmanager|doubleclick|hotjar")
+
+# CI等でのChromium起動を速くするフラグ。--single-process は本サイトでの安定性を
+# 確認できていないため入れていない
+_CHROMIUM_ARGS = ["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu", "--no-zygote"]
+
+# CSSトランジション/アニメーションを無効化し、テーブルHTMLがパースされ次第
+# セレクタ待ちが解決するようにする（描画演出の完了を待たない）
+_DISABLE_ANIMATIONS_JS = """
+document.addEventListener('DOMContentLoaded', () => {
+  const s = document.createElement('style');
+  s.textContent = '*{transition:none!important;animation:none!important;}';
+  document.head.appendChild(s);
+});
+"""
+
+def _route_filter(route):
+    req = route.request
+    if req.resource_type in _BLOCKED_RESOURCE_TYPES or _BLOCKED_HOSTS_RE.search(req.url):
+        route.abort()
+    else:
+        route.continue_()
+
+def open_page(browser):
+    """不要リソース遮断を設定したコンテキストと page を作って返す。"""
+    # JSTにしておくと時刻依存のサイトでも安心（念のため）
+    context = browser.new_context(locale="ja-JP", timezone_id="Asia/Tokyo")
+    context.add_init_script(_DISABLE_ANIMATIONS_JS)
+    context.route("**/*", _route_filter)
+    page = context.new_page()
+    return context, page
+
+# ========= ブラウザ不要の直接取得 =========
+_HTTP_UA = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+def extract_table_via_http():
+    """requests + lxml でテーブルを直接取得する。
+
+    テーブルがサーバーレンダリングされていれば Chromium 起動（数秒）を丸ごと
+    省けて ~200ms で済む。JS描画が必要なページ・lxml未導入なら None を返し、
+    呼び出し側がブラウザにフォールバックする。
+    """
+    try:
+        import lxml.html
+    except ImportError:
+        # auto なら黙ってブラウザへ。http 強制時は「テーブル無し」と区別してエラーにする
+        if FETCH_MODE == "http":
+            raise RuntimeError("FETCH_MODE=http ですが lxml が未インストールです。")
+        return None
+    import requests
+    try:
+        res = requests.get(PAGE_URL, headers={"User-Agent": _HTTP_UA}, timeout=30)
+        res.raise_for_status()
+    except Exception as e:
+        print(f"HTTP直接取得失敗（ブラウザにフォールバック）: {e}", file=sys.stderr)
+        return None
+
+    doc = lxml.html.fromstring(res.text)
+    header_cells = doc.xpath("//table//thead//th")
+    body_rows = doc.xpath("//table//tbody/tr")
+    if not header_cells or len(body_rows) <= 2:
+        # 初期HTMLにテーブル実体が無い＝JS描画。ブラウザで取り直す
+        return None
+    headers = [normalize_text(h.text_content()) for h in header_cells]
+    rows = []
+    for tr in body_rows:
+        cells = tr.xpath("./th|./td")
+        rows.append({
+            "label": normalize_text(cells[0].text_content()) if cells else "",
+            "cells": [normalize_text(c.text_content()) for c in cells],
+        })
+    return {"headers": headers, "rows": rows}
 
-    # 対象セル（列）取得
-    data_cells = target_row.query_selector_all("td")
-    if data_cells:
-        # 行頭がthでデータがtdの場合に備えてオフセット調整
-        j = col_idx - 1 if len(data_cells) + 1 == len(headers) else col_idx
-        if 0 <= j < len(data_cells):
-            return normalize_text(data_cells[j].inner_text())
-        raise RuntimeError(f"列インデックス計算に失敗しました (j={j}, len={len(data_cells)}).")
+# ========= ディスクキャッシュ =========
+def _page_validator():
+    """HEAD 1発で ETag/Last-Modified を取る。無ければ None（キャッシュ判定不能）。"""
+    import requests
+    try:
+        res = requests.head(PAGE_URL, headers={"User-Agent": _HTTP_UA}, timeout=10, allow_redirects=True)
+        return res.headers.get("ETag") or res.headers.get("Last-Modified")
+    except Exception:
+        return None
 
-    # フォールバック：行内のth/td混在配列で直接参照
-    cells = target_row.query_selector_all("th,td")
-    if 0 <= col_idx < len(cells):
-        return normalize_text(cells[col_idx].inner_text())
+def _load_disk_cache():
+    try:
+        with open(CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
 
-    raise RuntimeError("対象セルを取得できませんでした。")
+def _save_disk_cache(table, validator):
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        with open(CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"table": table, "validator": validator, "timestamp": time.time()}, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"キャッシュ保存失敗: {e}", file=sys.stderr)
 
 # ========= メイン =========
-def main():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        # JSTにしておくと時刻依存のサイトでも安心（念のため）
-        context = browser.new_context(locale="ja-JP", timezone_id="Asia/Tokyo")
-        page = context.new_page()
-        page.goto(PAGE_URL, wait_until="domcontentloaded", timeout=90000)
-        page.wait_for_timeout(5000)  # JS描画の猶予
-
-        results = {}  # {(row, date): symbol}
-        for row in TARGET_ROWS:
-            for d in TARGET_DATE_LABELS:
-                try:
-                    symbol = fetch_cell_symbol(page, row, d)
-                    results[(row, d)] = symbol
-                except Exception as e:
-                    results[(row, d)] = f"ERROR: {e}"
-        browser.close()
+def run_once(page):
+    """ナビゲーション済みの page からテーブルを読み、空きがあれば通知する。"""
+    # ナビゲーションは commit で即返るので、ここでテーブル本体が埋まるまで待つ。
+    # 候補セレクタはカンマ区切りのCSSユニオンで1回の待機に集約する
+    # （セレクタごとに直列で待つと不一致1つにつき最大 TIMEOUT_MS 浪費する）
+    page.wait_for_selector("tbody tr th, thead th", state="attached", timeout=TIMEOUT_MS)
+    page.wait_for_function("document.querySelectorAll('tbody tr').length > 2", timeout=TIMEOUT_MS)
+
+    # DOM読み取りは1回だけ。以降のマッチングはPython側のdictで行う
+    table = extract_table(page)
+    process_table(table)
+    return table
 
-    # 空き判定：〇/○/△ を含めばOK（「△ 残1」等も通知対象）
+def process_table(table, url=PAGE_URL):
+    """取得済みテーブルから対象セルを引き、空きがあれば通知する。"""
+    # ヘッダー走査は逆引き辞書の構築1回だけ（O(D・H) → O(H+D)）
+    header_index = build_header_index(table["headers"])
+    col_idx_by_date = {d: pick_column_index(table["headers"], d, header_index) for d in TARGET_DATE_LABELS}
+
+    # 行ラベル照合もテーブル1走査で済ませる
+    row_by_target = match_target_rows(table)
+
+    # SoA（並行配列）で持つ。dictより中間オブジェクトが少なく走査もキャッシュに優しい
+    rows_arr, dates_arr, symbols_arr = [], [], []
+    for row in TARGET_ROWS:
+        for d in TARGET_DATE_LABELS:
+            rows_arr.append(row)
+            dates_arr.append(d)
+            try:
+                symbols_arr.append(fetch_cell_symbol(table, row, d, col_idx_by_date[d], row_by_target.get(row)))
+            except Exception as e:
+                symbols_arr.append(f"ERROR: {e}")
+
+    # 空き判定：OK_SYMBOLS を含めばOK（「△ 残1」等も通知対象）
     def is_available_cell(text: str) -> bool:
         t = normalize_text(str(text))
-        return any(mark in t for mark in ("〇", "○", "△"))
-
-    # メッセージ生成（空きがある時だけ送る）
-    alerts, errors = [], []
-    for (row, d), symbol in results.items():
-        if is_available_cell(symbol):
-            alerts.append(f"{d} の {row}: {symbol}")
-        elif isinstance(symbol, str) and symbol.startswith("ERROR"):
-            errors.append(f"{d} の {row}: {symbol}")
-
-    if alerts:
-        lines = ["ふもとっぱら空き検知(Messaging API版)", "対象日: " + ", ".join(TARGET_DATE_LABELS)]
-        lines.append("【空きあり】")
-        lines += [f"・{a}" for a in alerts]
-        if errors:
-            lines.append("【取得エラー】(参考)")
-            lines += [f"・{e}" for e in errors]
-        lines.append(f"確認: {PAGE_URL}")
-        msg = "\n".join(lines)
+        # セルが記号1文字ぶんの典型ケースは集合参照1回で済む
+        return t in OK_SYMBOLS or any(mark in t for mark in OK_SYMBOLS)
+
+    if np is not None and symbols_arr:
+        # 文字列配列にして空き/エラー判定をベクトル化する
+        arr = np.array([normalize_text(str(s)) for s in symbols_arr], dtype=str)
+        avail = np.zeros(len(arr), dtype=bool)
+        for mark in OK_SYMBOLS:
+            avail |= np.char.find(arr, mark) >= 0
+        err = np.char.startswith(arr, "ERROR") & ~avail
+        ok_mask, err_mask = avail.tolist(), err.tolist()
+    else:
+        ok_mask = [is_available_cell(s) for s in symbols_arr]
+        err_mask = [(not ok) and str(s).startswith("ERROR") for ok, s in zip(ok_mask, symbols_arr)]
+
+    idx = range(len(symbols_arr))
+    ok_lines = [f"・{dates_arr[i]} の {rows_arr[i]}: {symbols_arr[i]}" for i in idx if ok_mask[i]]
+    err_lines = [f"・{dates_arr[i]} の {rows_arr[i]}: {symbols_arr[i]}" for i in idx if err_mask[i]]
+
+    if ok_lines:
+        # メッセージは chain ＋ join 1回で組む（中間リストの連結を避ける）
+        msg = "\n".join(itertools.chain(
+            ["ふもとっぱら空き検知(Messaging API版)", "対象日: " + ", ".join(TARGET_DATE_LABELS), "【空きあり】"],
+            ok_lines,
+            ["【取得エラー】(参考)"] if err_lines else [],
+            err_lines,
+            [f"確認: {url}"],
+        ))
         print(msg)
         try:
             line_broadcast(msg)
@@ -162,9 +431,131 @@ def main():
             print(f"LINE通知失敗: {e}", file=sys.stderr)
     else:
         # 空き無し：通知しない（ログのみ）
-        print("空き無し: " + str(results))
-        if errors:
-            print("取得エラー(ログのみ): " + "; ".join(errors))
+        print("空き無し: " + "; ".join(
+            f"{dates_arr[i]} の {rows_arr[i]}: {symbols_arr[i]}" for i in idx
+        ))
+        if err_lines:
+            print("取得エラー(ログのみ): " + "; ".join(err_lines))
+
+async def _route_filter_async(route):
+    req = route.request
+    if req.resource_type in _BLOCKED_RESOURCE_TYPES or _BLOCKED_HOSTS_RE.search(req.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def _fetch_raw_async(browser, sem, url):
+    """1つのURLを専用コンテキストで読み、生テーブル dict を返す。"""
+    async with sem:
+        context = await browser.new_context(locale="ja-JP", timezone_id="Asia/Tokyo")
+        try:
+            await context.add_init_script(_DISABLE_ANIMATIONS_JS)
+            await context.route("**/*", _route_filter_async)
+            page = await context.new_page()
+            await page.goto(url, wait_until="commit", timeout=30000)
+            await page.wait_for_selector("tbody tr th, thead th", state="attached", timeout=TIMEOUT_MS)
+            await page.wait_for_function("document.querySelectorAll('tbody tr').length > 2", timeout=TIMEOUT_MS)
+            return await page.evaluate(_EXTRACT_TABLE_JS)
+        finally:
+            await context.close()
+
+def watch_many(urls):
+    """複数URLを1ブラウザ＋複数コンテキストで並行チェックする。
+
+    直列ナビゲーションだとURL数ぶん待ち時間が積み上がるため、
+    asyncio.gather で同時に読む。同時実行はRAM節約のため4に制限。
+    """
+    import asyncio
+    from playwright.async_api import async_playwright
+
+    async def _run():
+        sem = asyncio.Semaphore(4)
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True, args=_CHROMIUM_ARGS)
+            try:
+                return await asyncio.gather(
+                    *[_fetch_raw_async(browser, sem, u) for u in urls],
+                    return_exceptions=True,
+                )
+            finally:
+                await browser.close()
+
+    for url, raw in zip(urls, asyncio.run(_run())):
+        if isinstance(raw, Exception):
+            print(f"{url} の取得失敗: {raw}", file=sys.stderr)
+            continue
+        process_table(_normalize_raw_table(raw), url=url)
+
+def main():
+    """従来どおりの一発実行（GitHub Actions 用）。"""
+    if len(PAGE_URLS) > 1:
+        watch_many(PAGE_URLS)
+        return
+
+    # ページ未更新ならブラウザもHTTP取得もスキップしてキャッシュで済ます
+    if CACHE_TTL_SEC > 0:
+        cached = _load_disk_cache()
+        if cached and time.time() - cached.get("timestamp", 0) < CACHE_TTL_SEC:
+            validator = _page_validator()
+            if validator and validator == cached.get("validator"):
+                print("ページ未更新のためキャッシュを再利用します（取得スキップ）。")
+                process_table(cached["table"])
+                return
+
+    # まずブラウザ無しで試す（FETCH_MODE=browser で強制的にスキップ可）
+    if FETCH_MODE in ("auto", "http"):
+        table = extract_table_via_http()
+        if table is not None:
+            process_table(table)
+            if CACHE_TTL_SEC > 0:
+                _save_disk_cache(table, _page_validator())
+            return
+        if FETCH_MODE == "http":
+            raise RuntimeError("HTTP直接取得でテーブルが見つかりませんでした（FETCH_MODE=http）。")
+
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=_CHROMIUM_ARGS)
+        context, page = open_page(browser)
+        page.goto(PAGE_URL, wait_until="commit", timeout=30000)
+        table = run_once(page)
+        browser.close()
+    if CACHE_TTL_SEC > 0:
+        _save_disk_cache(table, _page_validator())
+
+def serve():
+    """常駐モード（--daemon）。ブラウザを起動したまま INTERVAL_SEC ごとにチェックする。
+
+    セルフホストランナー等で Chromium のコールドスタート（2〜4秒/回）を省く。
+    """
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=_CHROMIUM_ARGS)
+        context, page = open_page(browser)
+        page.goto(PAGE_URL, wait_until="commit", timeout=30000)
+        while True:
+            try:
+                run_once(page)
+            except Exception as e:
+                print(f"チェック失敗: {e}", file=sys.stderr)
+                # ページが壊れていたら作り直して次の周回で再試行
+                try:
+                    page.close()
+                except Exception:
+                    pass
+                page = context.new_page()
+                page.goto(PAGE_URL, wait_until="commit", timeout=30000)
+            time.sleep(INTERVAL_SEC)
+            try:
+                page.reload(wait_until="commit", timeout=30000)
+            except Exception:
+                page = context.new_page()
+                page.goto(PAGE_URL, wait_until="commit", timeout=30000)
 
 if __name__ == "__main__":
-    main()
+    if "--daemon" in sys.argv[1:]:
+        serve()
+    else:
+        main()